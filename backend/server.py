@@ -3,16 +3,37 @@ JUMIA Analytics Dashboard - FastAPI Backend
 Serves data from data.json through REST API endpoints
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from pathlib import Path
+import asyncio
 import json
-from typing import Dict, Any
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from snapshot import SnapshotReader, encode_json, publish_snapshot, try_acquire_leader
+
+logger = logging.getLogger("uvicorn.error")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the leader election / publication loop in shared snapshot mode"""
+    task = asyncio.ensure_future(leader_loop()) if SHARED_SNAPSHOT else None
+    yield
+    if task is not None:
+        task.cancel()
 
 app = FastAPI(
     title="JUMIA Analytics API",
     description="REST API for JUMIA analytics dashboard data",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS for frontend
@@ -26,23 +47,215 @@ app.add_middleware(
 
 # Path to data file
 DATA_FILE = Path(__file__).parent / 'data' / 'data.json'
+FETCH_SCRIPT = Path(__file__).parent.parent / 'scripts' / 'fetch_data.py'
+REFRESH_TIMEOUT = 120  # 2 minute timeout
+
+# Multi-worker mode: every worker serves pre-encoded sections from a shared
+# memory-mapped snapshot, and a single leader worker owns refresh and publication
+SHARED_SNAPSHOT = os.getenv('SHARED_SNAPSHOT', '').lower() in ('1', 'true', 'yes')
+SNAPSHOT_FILE = DATA_FILE.parent / 'snapshot.bin'
+LEADER_LOCK_FILE = DATA_FILE.parent / '.leader.lock'
+REFRESH_REQUEST_FILE = DATA_FILE.parent / '.refresh_request'
+REFRESH_RESULT_FILE = DATA_FILE.parent / '.refresh_result.json'
+LEADER_POLL_INTERVAL = 0.5  # Seconds between leader checks for new data and refresh requests
+
+# Response sections and the data.json keys (with defaults) each one carries
+SECTIONS = {
+    "company": {"company": {}},
+    "competitors": {"competitors": {}},
+    "trends": {"trends": {}},
+    "news": {"news": []},
+    "app": {"app": {}},
+    "traffic": {"traffic": {}, "youtube": {}},
+}
+
+# Last successfully parsed snapshot, served while data.json is being rewritten
+_snapshot: Dict[str, Any] = {"mtime": None, "data": None}
+
+# In-flight refresh shared by all concurrent /api/refresh callers
+_refresh_task: Optional[asyncio.Task] = None
+
+# Held leader lock (shared snapshot mode) and this worker's view of the snapshot
+_leader_lock = None
+_snapshot_reader = SnapshotReader(SNAPSHOT_FILE)
+
+# data.json mtime the leader last attempted to publish (even if it was unreadable)
+_published_mtime: Optional[int] = None
 
 def load_data() -> Dict[str, Any]:
-    """Load data from JSON file"""
+    """Load data from JSON file, reusing the last good snapshot when unchanged or unreadable"""
     try:
         if not DATA_FILE.exists():
+            if _snapshot["data"] is not None:
+                return _snapshot["data"]
             return {
                 "error": "Data file not found. Please run the data fetching script first.",
                 "message": "Run: python scripts/fetch_data.py"
             }
         
+        mtime = DATA_FILE.stat().st_mtime_ns
+        if mtime == _snapshot["mtime"]:
+            return _snapshot["data"]
+        
         with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            data = json.load(f)
+        
+        _snapshot["mtime"] = mtime
+        _snapshot["data"] = data
+        return data
     except Exception as e:
+        # Stale-while-revalidate: keep serving the last good snapshot
+        if _snapshot["data"] is not None:
+            return _snapshot["data"]
         return {
             "error": f"Failed to load data: {str(e)}"
         }
 
+def is_load_error(data: Dict[str, Any]) -> bool:
+    """Whether load_data() returned only an error and message"""
+    return "error" in data and len(data) == 2
+
+def build_section(data: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Build the response body for a section ("data" is the complete dataset)"""
+    if name == "data":
+        return data
+    
+    body = {key: data.get(key, default) for key, default in SECTIONS[name].items()}
+    body["fetched_at"] = data.get("fetched_at", "")
+    return body
+
+class SnapshotResponse(Response):
+    """JSON response whose body is a memoryview into the shared snapshot, sent without copying"""
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> Any:
+        return content
+
+def serve_section(name: str):
+    """Serve a section from the shared snapshot, or from data.json in single-process mode"""
+    if SHARED_SNAPSHOT:
+        body = _snapshot_reader.get(name)
+        if body is None:
+            raise HTTPException(status_code=500, detail=_snapshot_reader.error or "Snapshot not published yet")
+        return SnapshotResponse(content=body)
+    
+    data = load_data()
+    if is_load_error(data):
+        raise HTTPException(status_code=500, detail=data["error"])
+    return build_section(data, name)
+
+def publish_data() -> None:
+    """Encode every section of the current data.json into the shared snapshot"""
+    global _published_mtime
+    
+    # Record the version attempted, so an unreadable data.json is not retried
+    # (and the snapshot rewritten) on every poll until it changes again
+    _published_mtime = DATA_FILE.stat().st_mtime_ns if DATA_FILE.exists() else None
+    data = load_data()
+    if is_load_error(data):
+        publish_snapshot(SNAPSHOT_FILE, {}, error=data["error"])
+        return
+    if _snapshot["mtime"] != _published_mtime and SNAPSHOT_FILE.exists():
+        return  # Unreadable data.json: the published snapshot is already the last good one
+    
+    sections = {name: encode_json(build_section(data, name)) for name in ["data", *SECTIONS]}
+    publish_snapshot(SNAPSHOT_FILE, sections)
+
+def write_refresh_result(result: Dict[str, Any]) -> None:
+    """Atomically publish the leader's latest refresh result for other workers"""
+    tmp_path = REFRESH_RESULT_FILE.with_name(f"{REFRESH_RESULT_FILE.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(result), encoding='utf-8')
+    os.replace(tmp_path, REFRESH_RESULT_FILE)
+
+def run_fetch_script() -> Dict[str, Any]:
+    """Run the data fetch script in a subprocess and summarise the result"""
+    result = subprocess.run(
+        [sys.executable, str(FETCH_SCRIPT)],
+        cwd=str(FETCH_SCRIPT.parent),
+        capture_output=True,
+        text=True,
+        timeout=REFRESH_TIMEOUT
+    )
+    
+    return {
+        "status": "success" if result.returncode == 0 else "error",
+        "message": "Data refresh completed" if result.returncode == 0 else "Data refresh failed",
+        "output": result.stdout[-500:] if result.stdout else "",  # Last 500 chars
+        "error": result.stderr[-500:] if result.stderr else ""
+    }
+
+def start_refresh() -> Tuple[asyncio.Task, bool]:
+    """Start a fetch run, or join the one already in flight"""
+    global _refresh_task
+    
+    coalesced = _refresh_task is not None and not _refresh_task.done()
+    if not coalesced:
+        _refresh_task = asyncio.ensure_future(run_in_threadpool(run_fetch_script))
+    return _refresh_task, coalesced
+
+async def refresh_as_leader() -> Dict[str, Any]:
+    """Run (or join) a refresh in this worker and publish the result"""
+    task, coalesced = start_refresh()
+    # Shield so one caller disconnecting does not cancel the shared run
+    result = await asyncio.shield(task)
+    if SHARED_SNAPSHOT and DATA_FILE.exists() and DATA_FILE.stat().st_mtime_ns != _published_mtime:
+        await run_in_threadpool(publish_data)
+    return {**result, "coalesced": coalesced}
+
+async def refresh_via_leader() -> Dict[str, Any]:
+    """Ask the leader worker for a refresh and wait for a result that started after the request"""
+    requested_at = time.time()
+    REFRESH_REQUEST_FILE.write_text(str(requested_at), encoding='utf-8')
+    
+    deadline = requested_at + REFRESH_TIMEOUT + 30
+    while time.time() < deadline:
+        await asyncio.sleep(LEADER_POLL_INTERVAL)
+        try:
+            result = json.loads(REFRESH_RESULT_FILE.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        if result.pop("started_at", 0) >= requested_at:
+            return result
+    
+    raise subprocess.TimeoutExpired(str(FETCH_SCRIPT), REFRESH_TIMEOUT)
+
+async def leader_loop() -> None:
+    """Elect a leader; the leader publishes new data.json versions and serves refresh requests"""
+    global _leader_lock
+    handled_request = 0
+    
+    while True:
+        try:
+            if _leader_lock is None:
+                _leader_lock = try_acquire_leader(LEADER_LOCK_FILE)
+                if _leader_lock is not None:
+                    logger.info(f"Worker {os.getpid()} is the snapshot leader")
+                    # A request file left by an earlier leader or run is not a new request
+                    if REFRESH_REQUEST_FILE.exists():
+                        handled_request = REFRESH_REQUEST_FILE.stat().st_mtime_ns
+            
+            if _leader_lock is not None:
+                # Publish whenever data.json changed (including refreshes run by cron)
+                data_mtime = DATA_FILE.stat().st_mtime_ns if DATA_FILE.exists() else None
+                if data_mtime != _published_mtime or not SNAPSHOT_FILE.exists():
+                    await run_in_threadpool(publish_data)
+                
+                requested = REFRESH_REQUEST_FILE.stat().st_mtime_ns if REFRESH_REQUEST_FILE.exists() else 0
+                if requested > handled_request:
+                    handled_request = requested
+                    started_at = time.time()
+                    try:
+                        result = await refresh_as_leader()
+                    except subprocess.TimeoutExpired:
+                        result = {"status": "error", "message": "Data fetch timed out", "output": "", "error": ""}
+                    except Exception as e:
+                        result = {"status": "error", "message": "Data refresh failed", "output": "", "error": str(e)}
+                    write_refresh_result({**result, "started_at": started_at})
+        except Exception as e:
+            logger.warning(f"Snapshot leader loop error: {e}")
+        
+        await asyncio.sleep(LEADER_POLL_INTERVAL)
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -61,113 +274,53 @@ async def root():
 @app.get("/api/data")
 async def get_all_data():
     """Get complete dataset"""
-    data = load_data()
-    if "error" in data and len(data) == 2:  # Only error and message keys
-        raise HTTPException(status_code=500, detail=data["error"])
-    return data
+    return serve_section("data")
 
 @app.get("/api/company")
 async def get_company_data():
     """Get company KPIs only"""
-    data = load_data()
-    if "error" in data and len(data) == 2:
-        raise HTTPException(status_code=500, detail=data["error"])
-    
-    return {
-        "company": data.get("company", {}),
-        "fetched_at": data.get("fetched_at", "")
-    }
+    return serve_section("company")
 
 @app.get("/api/competitors")
 async def get_competitors_data():
     """Get competitor data"""
-    data = load_data()
-    if "error" in data and len(data) == 2:
-        raise HTTPException(status_code=500, detail=data["error"])
-    
-    return {
-        "competitors": data.get("competitors", {}),
-        "fetched_at": data.get("fetched_at", "")
-    }
+    return serve_section("competitors")
 
 @app.get("/api/trends")
 async def get_trends_data():
     """Get Google Trends data"""
-    data = load_data()
-    if "error" in data and len(data) == 2:
-        raise HTTPException(status_code=500, detail=data["error"])
-    
-    return {
-        "trends": data.get("trends", {}),
-        "fetched_at": data.get("fetched_at", "")
-    }
+    return serve_section("trends")
 
 @app.get("/api/news")
 async def get_news():
     """Get news articles"""
-    data = load_data()
-    if "error" in data and len(data) == 2:
-        raise HTTPException(status_code=500, detail=data["error"])
-    
-    return {
-        "news": data.get("news", []),
-        "fetched_at": data.get("fetched_at", "")
-    }
+    return serve_section("news")
 
 @app.get("/api/app")
 async def get_app_data():
     """Get app store data"""
-    data = load_data()
-    if "error" in data and len(data) == 2:
-        raise HTTPException(status_code=500, detail=data["error"])
-    
-    return {
-        "app": data.get("app", {}),
-        "fetched_at": data.get("fetched_at", "")
-    }
+    return serve_section("app")
 
 @app.get("/api/traffic")
 async def get_traffic_data():
     """Get website traffic data"""
-    data = load_data()
-    if "error" in data and len(data) == 2:
-        raise HTTPException(status_code=500, detail=data["error"])
-    
-    return {
-        "traffic": data.get("traffic", {}),
-        "youtube": data.get("youtube", {}),
-        "fetched_at": data.get("fetched_at", "")
-    }
+    return serve_section("traffic")
 
 @app.get("/api/refresh")
 async def refresh_data():
-    """Trigger data fetch script to update data.json"""
-    import subprocess
-    import os
+    """Trigger data fetch script to update data.json
+    
+    Concurrent calls are coalesced onto a single fetch run; readers keep
+    getting the last good snapshot until the new data.json is published.
+    In shared snapshot mode, non-leader workers hand the refresh to the leader.
+    """
+    if not FETCH_SCRIPT.exists():
+        raise HTTPException(status_code=404, detail="Fetch script not found")
     
     try:
-        # Get the scripts directory path
-        script_dir = Path(__file__).parent.parent / 'scripts'
-        fetch_script = script_dir / 'fetch_data.py'
-        
-        if not fetch_script.exists():
-            raise HTTPException(status_code=404, detail="Fetch script not found")
-        
-        # Run the fetch script
-        result = subprocess.run(
-            ['python', str(fetch_script)],
-            cwd=str(script_dir),
-            capture_output=True,
-            text=True,
-            timeout=120  # 2 minute timeout
-        )
-        
-        return {
-            "status": "success" if result.returncode == 0 else "error",
-            "message": "Data refresh completed" if result.returncode == 0 else "Data refresh failed",
-            "output": result.stdout[-500:] if result.stdout else "",  # Last 500 chars
-            "error": result.stderr[-500:] if result.stderr else ""
-        }
+        if SHARED_SNAPSHOT and _leader_lock is None:
+            return await refresh_via_leader()
+        return await refresh_as_leader()
     except subprocess.TimeoutExpired:
         raise HTTPException(status_code=408, detail="Data fetch timed out")
     except Exception as e:
@@ -180,7 +333,10 @@ async def health_check():
     return {
         "status": "healthy" if data_exists else "warning",
         "data_file_exists": data_exists,
-        "data_file_path": str(DATA_FILE)
+        "data_file_path": str(DATA_FILE),
+        "refresh_in_flight": _refresh_task is not None and not _refresh_task.done(),
+        "mode": "shared_snapshot" if SHARED_SNAPSHOT else "single_process",
+        "leader": SHARED_SNAPSHOT and _leader_lock is not None
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+"""
+JUMIA Analytics Dashboard - Shared Snapshot
+Pre-encoded API sections published to a memory-mapped file shared by all workers
+"""
+
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no leader election, every worker acts alone
+    fcntl = None
+
+# File layout: header (magic, index length), JSON index, concatenated section bytes.
+# Section offsets in the index are relative to the start of the section bytes.
+MAGIC = b'JSNAP1'
+HEADER = struct.Struct('<6sI')
+
+def encode_json(obj: Any) -> bytes:
+    """Encode a response body the same way FastAPI's JSONResponse does"""
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode('utf-8')
+
+def publish_snapshot(path: Path, sections: Dict[str, bytes], error: Optional[str] = None) -> None:
+    """Atomically write encoded sections to the snapshot file"""
+    index = {"sections": {}, "error": error}
+    offset = 0
+    for name, body in sections.items():
+        index["sections"][name] = [offset, len(body)]
+        offset += len(body)
+
+    index_bytes = json.dumps(index).encode('utf-8')
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(index_bytes)))
+        f.write(index_bytes)
+        for body in sections.values():
+            f.write(body)
+    os.replace(tmp_path, path)
+
+class SnapshotReader:
+    """Read-only view of the published snapshot, remapped whenever it is republished"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.error: Optional[str] = None
+        self._key: Optional[Tuple[int, int]] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._sections: Dict[str, Tuple[int, int]] = {}
+
+    def _remap(self) -> None:
+        """Map the snapshot file again if a new one was published"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.error = "Snapshot not published yet"
+            return
+
+        key = (stat.st_ino, stat.st_mtime_ns)
+        if key == self._key:
+            return
+
+        with open(self.path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_len = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            mapped.close()
+            raise ValueError(f"Invalid snapshot file: {self.path}")
+        index = json.loads(bytes(mapped[HEADER.size:HEADER.size + index_len]))
+
+        # The previous mapping is not closed: responses may still hold views of
+        # it, and it is unmapped once the last of them is released
+        self._mmap = mapped
+        base = HEADER.size + index_len
+        self._sections = {name: (base + offset, length) for name, (offset, length) in index["sections"].items()}
+        self.error = index.get("error")
+        self._key = key
+
+    def get(self, name: str) -> Optional[memoryview]:
+        """Return a zero-copy view of a section's encoded bytes, or None if it is not published"""
+        self._remap()
+        entry = self._sections.get(name)
+        if entry is None or self._mmap is None:
+            return None
+        offset, length = entry
+        return memoryview(self._mmap)[offset:offset + length]
+
+def try_acquire_leader(lock_path: Path):
+    """Take the leader lock without blocking; returns the held lock file or None"""
+    if fcntl is None:
+        return open(lock_path, 'w')
+
+    lock = open(lock_path, 'w')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    return lock
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+JUMIA Analytics API Benchmark
+Generates a synthetic data.json, serves it with the backend at one or more git
+revisions and load-tests every /api/* endpoint (except /api/refresh, which hits
+the real upstream sources). Runs fully offline.
+
+Examples:
+    python benchmark_api.py
+    python benchmark_api.py --news 500 --trend-weeks 260 --competitors 50 --concurrency 64
+    python benchmark_api.py --rev HEAD~1 --rev WORKTREE --json results.json
+    python benchmark_api.py --workers 4 --client-procs 4 --env SHARED_SNAPSHOT=1
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+WORKTREE = 'WORKTREE'  # Pseudo-revision for the uncommitted working tree
+
+ENDPOINTS = [
+    '/api/data',
+    '/api/company',
+    '/api/competitors',
+    '/api/trends',
+    '/api/news',
+    '/api/app',
+    '/api/traffic',
+]
+
+def log(message, status="INFO"):
+    """Print formatted log message"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] [{status}] {message}", file=sys.stderr)
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+def generate_data(news_count, trend_weeks, competitor_count, seed=0):
+    """Build a data.json snapshot shaped like fetch_data.py output"""
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1)
+
+    competitor_names = [f'Competitor {i}' for i in range(competitor_count)]
+    keywords = ['Jumia Algeria', *competitor_names]
+
+    timeseries = []
+    for week in range(trend_weeks):
+        point = {'date': (now - timedelta(weeks=trend_weeks - week)).strftime('%Y-%m-%d')}
+        for keyword in keywords:
+            point[keyword] = rng.randint(0, 100)
+        timeseries.append(point)
+
+    competitors = {
+        name: {
+            'name': name,
+            'app_rating': round(rng.uniform(3.0, 5.0), 1),
+            'website': f'https://www.competitor{i}.dz',
+            'website_rank': None,
+            'estimation_method': 'fallback',
+            'region': 'Algeria',
+            'estimated_monthly_visitors': rng.randint(100_000, 15_000_000),
+            'market_focus': 'Algeria'
+        }
+        for i, name in enumerate(competitor_names)
+    }
+
+    news = [
+        {
+            'title': f'Jumia synthetic headline number {i} about e-commerce in Africa',
+            'source': rng.choice(['Reuters', 'TechCabal', 'Bloomberg', 'Le Monde']),
+            'publishedAt': (now - timedelta(hours=i)).isoformat() + 'Z',
+            'url': f'https://news.example.com/jumia/{i}',
+            'summary': ' '.join(rng.choice(['Jumia', 'growth', 'orders', 'Algeria', 'revenue', 'logistics', 'é'])
+                                for _ in range(30))[:200]
+        }
+        for i in range(news_count)
+    ]
+
+    return {
+        'company': {
+            'name': 'Jumia Algeria (Jumia Technologies AG)',
+            'founded': 2012,
+            'countries': ['Algeria', 'Egypt', 'Ghana', 'Ivory Coast', 'Kenya',
+                          'Morocco', 'Nigeria', 'Senegal', 'South Africa', 'Tunisia', 'Uganda'],
+            'revenue': 185000000,
+            'revenue_currency': 'USD',
+            'gmv': 1200000000,
+            'active_users': 4200000,
+            'funding_total': 823000000,
+            'estimation_method': 'synthetic',
+            'confidence': 'low'
+        },
+        'competitors': competitors,
+        'trends': {
+            'timeseries': timeseries,
+            'by_region': [{'city': f'City {i}', 'interest': rng.randint(0, 100)} for i in range(15)],
+            'region_focus': 'Algeria'
+        },
+        'app': {
+            'play_store': {'rating': 4.2, 'reviews': 500000, 'installs': 10000000, 'estimation_method': 'synthetic'},
+            'app_store': {'rating': 4.4, 'ratings_count': 250000, 'estimation_method': 'synthetic'}
+        },
+        'traffic': {
+            'similarweb': {'global_rank': 5000, 'monthly_visits': 25000000, 'estimation_method': 'synthetic'}
+        },
+        'youtube': {'subscribers': 50000, 'estimation_method': 'synthetic'},
+        'news': news,
+        'fetched_at': now.isoformat(),
+        'source_status': {'synthetic': {'status': 'ok'}}
+    }
+
+# ---------------------------------------------------------------------------
+# Backend checkout and server process
+# ---------------------------------------------------------------------------
+
+def materialize_backend(rev, dest):
+    """Copy backend/ at a git revision (or the working tree) into dest"""
+    if rev == WORKTREE:
+        shutil.copytree(REPO_ROOT / 'backend', dest / 'backend',
+                        ignore=shutil.ignore_patterns('__pycache__', 'data'))
+    else:
+        archive = subprocess.run(['git', 'archive', '--format=tar', rev, 'backend'],
+                                 cwd=REPO_ROOT, capture_output=True, check=True).stdout
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(dest)
+    return dest / 'backend'
+
+def free_port():
+    """Pick an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(backend_dir, port, workers, env):
+    """Start uvicorn serving backend_dir/server.py"""
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'server:app', '--host', '127.0.0.1',
+         '--port', str(port), '--workers', str(workers), '--log-level', 'warning'],
+        cwd=str(backend_dir),
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL
+    )
+
+def stop_server(process):
+    """Terminate the server and its workers"""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+async def wait_until_ready(port, timeout=30):
+    """Poll an endpoint until the server answers with 200"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                status, _ = await http_get(reader, writer, '/api/company')
+                if status == 200:
+                    return
+            finally:
+                writer.close()
+        except (OSError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+# ---------------------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------------------
+
+async def http_get(reader, writer, path):
+    """Send a keep-alive GET and read the full response; returns (status, body length)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: keep-alive\r\n\r\n".encode())
+    await writer.drain()
+
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.lower() == 'content-length':
+            length = int(value.strip())
+    await reader.readexactly(length)
+    return status, length
+
+async def drive_endpoint(port, path, total_requests, concurrency):
+    """Issue total_requests GETs over concurrency keep-alive connections"""
+    latencies = []
+    errors = 0
+    remaining = total_requests
+
+    async def connection():
+        nonlocal remaining, errors
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                status, _ = await http_get(reader, writer, path)
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    errors += 1
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return latencies, errors
+
+def client_process(args):
+    """Load generator entry point for one client process"""
+    port, path, total_requests, concurrency = args
+    started = time.perf_counter()
+    latencies, errors = asyncio.run(drive_endpoint(port, path, total_requests, concurrency))
+    return latencies, errors, started, time.perf_counter()
+
+def run_load(port, path, total_requests, concurrency, client_procs):
+    """Drive one endpoint from client_procs processes and merge their latencies"""
+    jobs = [
+        (port, path, total_requests // client_procs + (i < total_requests % client_procs),
+         max(1, concurrency // client_procs))
+        for i in range(client_procs)
+    ]
+    if client_procs == 1:
+        results = [client_process(jobs[0])]
+    else:
+        with multiprocessing.Pool(client_procs) as pool:
+            results = pool.map(client_process, jobs)
+
+    latencies = [latency for result in results for latency in result[0]]
+    errors = sum(result[1] for result in results)
+    elapsed = max(result[3] for result in results) - min(result[2] for result in results)
+    return latencies, errors, elapsed
+
+def summarize(latencies, errors, elapsed):
+    """Throughput and latency percentiles (ms) for one endpoint"""
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+    }
+
+# ---------------------------------------------------------------------------
+# Allocation probe (runs inside a child interpreter in the backend directory)
+# ---------------------------------------------------------------------------
+
+async def asgi_get(app, path):
+    """Call the ASGI app directly for a GET request and return (status, body)"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 80),
+    }
+    status = None
+    body = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            body.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return status, b''.join(body)
+
+async def asgi_lifespan(app):
+    """Run the app's lifespan startup (as uvicorn would); returns a coroutine function that shuts it down"""
+    events = asyncio.Queue()
+    started = asyncio.get_running_loop().create_future()
+    await events.put({'type': 'lifespan.startup'})
+
+    async def receive():
+        return await events.get()
+
+    async def send(message):
+        if message['type'].startswith('lifespan.startup') and not started.done():
+            started.set_result(message['type'])
+
+    task = asyncio.ensure_future(app({'type': 'lifespan', 'asgi': {'version': '3.0'}}, receive, send))
+    outcome = await started
+    if outcome != 'lifespan.startup.complete':
+        raise RuntimeError(f"Lifespan startup failed: {outcome}")
+
+    async def shutdown():
+        await events.put({'type': 'lifespan.shutdown'})
+        await asyncio.wait_for(task, timeout=10)
+
+    return shutdown
+
+async def wait_until_serving(app, timeout=30):
+    """Poll the app in-process until it serves data (e.g. the leader published its snapshot)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, _ = await asgi_get(app, '/api/company')
+        if status == 200:
+            return
+        await asyncio.sleep(0.1)
+    raise RuntimeError("App did not start serving data")
+
+def measure_allocations(iterations):
+    """Peak bytes allocated per request for each endpoint, measured with tracemalloc
+    
+    Runs in the same environment as the benchmarked server, including its
+    lifespan startup, so e.g. SHARED_SNAPSHOT=1 measures the shared snapshot path.
+    """
+    import tracemalloc
+
+    sys.path.insert(0, os.getcwd())
+    from server import app
+
+    async def probe():
+        shutdown = await asgi_lifespan(app)
+        await wait_until_serving(app)
+        results = {}
+        for path in ENDPOINTS:
+            for _ in range(3):  # Warm up caches and lazily built middleware
+                await asgi_get(app, path)
+
+            tracemalloc.start()
+            peaks = []
+            for _ in range(iterations):
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                await asgi_get(app, path)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            tracemalloc.stop()
+            results[path] = round(statistics.mean(peaks) / 1024, 1)
+        await shutdown()
+        return results
+
+    print(json.dumps(asyncio.run(probe())))
+
+def run_allocation_probe(backend_dir, iterations, server_env):
+    """Run measure_allocations() in a fresh interpreter inside backend_dir, with the server's environment"""
+    env = {**os.environ, **server_env}
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), '--measure-allocations', str(iterations)],
+        cwd=str(backend_dir), env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        log(f"Allocation probe failed: {result.stderr.strip()[-300:]}", "WARN")
+        return {}
+    return json.loads(result.stdout)
+
+# ---------------------------------------------------------------------------
+# Benchmark driver
+# ---------------------------------------------------------------------------
+
+def benchmark_revision(rev, data_bytes, args):
+    """Benchmark every endpoint of the backend at one revision"""
+    with tempfile.TemporaryDirectory(prefix='jumia-bench-') as tmp:
+        backend_dir = materialize_backend(rev, Path(tmp))
+        (backend_dir / 'data').mkdir(exist_ok=True)
+        (backend_dir / 'data' / 'data.json').write_bytes(data_bytes)
+
+        env = dict(item.split('=', 1) for item in args.env)
+        port = free_port()
+        server = start_server(backend_dir, port, args.workers, env)
+        try:
+            asyncio.run(wait_until_ready(port))
+            results = {}
+            for path in ENDPOINTS:
+                run_load(port, path, args.warmup, args.concurrency, 1)
+                latencies, errors, elapsed = run_load(port, path, args.requests, args.concurrency, args.client_procs)
+                results[path] = summarize(latencies, errors, elapsed)
+                log(f"{rev} {path}: {results[path]['rps']} req/s, p99 {results[path]['p99_ms']} ms")
+        finally:
+            stop_server(server)
+
+        allocations = run_allocation_probe(backend_dir, args.alloc_iterations, env)
+        for path, kb in allocations.items():
+            results[path]['alloc_peak_kb'] = kb
+        return results
+
+def print_report(all_results):
+    """Print a per-endpoint table, with deltas against the first revision"""
+    revisions = list(all_results)
+    base = all_results[revisions[0]]
+    header = f"{'endpoint':16s} {'revision':12s} {'req/s':>10s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'alloc KB':>9s} {'errors':>7s}"
+    print(header)
+    print('-' * len(header))
+    for path in ENDPOINTS:
+        for rev in revisions:
+            row = all_results[rev][path]
+            line = (f"{path:16s} {rev[:12]:12s} {row['rps']:10.1f} {row['p50_ms']:9.3f} {row['p95_ms']:9.3f} "
+                    f"{row['p99_ms']:9.3f} {row.get('alloc_peak_kb', float('nan')):9.1f} {row['errors']:7d}")
+            if rev != revisions[0] and base[path]['rps']:
+                line += f"  ({(row['rps'] / base[path]['rps'] - 1) * 100:+.1f}% req/s)"
+            print(line)
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Offline load and latency benchmark for the JUMIA Analytics API")
+    parser.add_argument('--rev', action='append', default=[],
+                        help=f"git revision to benchmark (repeatable; {WORKTREE} = working tree, the default)")
+    parser.add_argument('--news', type=int, default=15, help="news articles in the synthetic snapshot")
+    parser.add_argument('--trend-weeks', type=int, default=52, help="weekly trend points in the synthetic snapshot")
+    parser.add_argument('--competitors', type=int, default=4, help="competitors (and trend keywords) in the snapshot")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the synthetic snapshot")
+    parser.add_argument('--requests', type=int, default=2000, help="measured requests per endpoint")
+    parser.add_argument('--warmup', type=int, default=200, help="unmeasured warm-up requests per endpoint")
+    parser.add_argument('--concurrency', type=int, default=16, help="concurrent keep-alive connections")
+    parser.add_argument('--client-procs', type=int, default=1, help="load generator processes")
+    parser.add_argument('--workers', type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help="extra environment for the server (e.g. SHARED_SNAPSHOT=1)")
+    parser.add_argument('--alloc-iterations', type=int, default=50, help="requests per endpoint for the allocation probe")
+    parser.add_argument('--json', type=Path, help="also write results to this JSON file")
+    parser.add_argument('--measure-allocations', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_allocations:
+        measure_allocations(args.measure_allocations)
+        return
+
+    data = generate_data(args.news, args.trend_weeks, args.competitors, args.seed)
+    data_bytes = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    log(f"Synthetic data.json: {len(data_bytes) / 1024:.1f} KB "
+        f"({args.news} news, {args.trend_weeks} trend weeks, {args.competitors} competitors)")
+
+    all_results = {}
+    for rev in args.rev or [WORKTREE]:
+        all_results[rev] = benchmark_revision(rev, data_bytes, args)
+
+    print_report(all_results)
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            'config': {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()
+                       if k != 'measure_allocations'},
+            'data_bytes': len(data_bytes),
+            'results': all_results
+        }, indent=2), encoding='utf-8')
+        log(f"Results written to: {args.json}")
+
+if __name__ == "__main__":
+    main()
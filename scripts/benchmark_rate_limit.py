@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+JUMIA Fetcher Rate-Limit Benchmark
+Runs local HTTP stubs that throttle like a real upstream (429 + Retry-After) and
+compares the old fixed-delay fetch loop with the adaptive per-host limiter:
+throughput, throttled responses, fallback estimates and time-to-fresh-data.
+Runs fully offline.
+
+Examples:
+    python benchmark_rate_limit.py
+    python benchmark_rate_limit.py --sources 30 --hosts 3 --stub-rate 2 --no-retry-after
+"""
+
+import argparse
+import math
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import fetch_data
+from fetch_data import HostRateLimiter, extract_number, polite_get, run_with_requeue
+
+PAGE = b"<html><body>Global Rank: #1,234 <span>12.5M Total Visits</span></body></html>"
+
+class ThrottlingStub:
+    """Local HTTP server with a token bucket that answers 429 when it is exceeded"""
+
+    def __init__(self, rate, burst, latency, retry_after):
+        self.rate = rate
+        self.burst = burst
+        self.latency = latency
+        self.retry_after = retry_after
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.served = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                wait = stub.take_token()
+                if wait > 0:
+                    self.send_response(429)
+                    if stub.retry_after:
+                        self.send_header('Retry-After', str(math.ceil(wait)))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                time.sleep(stub.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(PAGE)))
+                self.end_headers()
+                self.wfile.write(PAGE)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def take_token(self):
+        """Consume a token; returns 0 if allowed, else seconds until one is available"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.served += 1
+                return 0.0
+            self.throttled += 1
+            return (1 - self.tokens) / self.rate
+
+    def reset(self):
+        with self.lock:
+            self.tokens = self.burst
+            self.updated = time.monotonic()
+            self.served = 0
+            self.throttled = 0
+
+    def close(self):
+        self.server.shutdown()
+
+def parse_page(response):
+    """Extract the SimilarWeb-style rank from a stub page, or None on fallback"""
+    if response.status_code != 200:
+        return None
+    return extract_number(response.text.split('Global Rank: #')[1].split()[0])
+
+def run_fixed_delay(urls, delay, results, started):
+    """Previous behaviour: one attempt per source, fixed sleep, fallback on any error"""
+    for name, url in urls:
+        response = requests.get(url, timeout=10)
+        results[name] = (parse_page(response), time.monotonic() - started)
+        time.sleep(delay)
+
+def run_adaptive(urls, initial_interval, results, started):
+    """Adaptive limiter: per-host token buckets, 429s re-queue the source"""
+    limiter = HostRateLimiter(initial_interval=initial_interval)
+
+    def fetch_one(name, url):
+        response = polite_get(url, limiter=limiter, timeout=10)
+        results[name] = (parse_page(response), time.monotonic() - started)
+
+    run_with_requeue([(name, partial(fetch_one, name, url)) for name, url in urls], limiter)
+
+def benchmark(mode, runner, urls, stubs):
+    """Run one strategy against the stubs and summarise it"""
+    for stub in stubs:
+        stub.reset()
+    results = {}
+    started = time.monotonic()
+    runner(urls, results=results, started=started)
+    elapsed = time.monotonic() - started
+
+    fresh_times = [at for value, at in results.values() if value is not None]
+    fresh = len(fresh_times)
+    return {
+        'mode': mode,
+        'fresh': fresh,
+        'fallbacks': len(results) - fresh,
+        'throttled': sum(stub.throttled for stub in stubs),
+        'elapsed_s': round(elapsed, 2),
+        'time_to_fresh_s': round(max(fresh_times), 2) if fresh == len(results) else None,
+        'fresh_per_s': round(fresh / elapsed, 2) if elapsed else 0.0,
+    }
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Compare fixed-delay and adaptive fetching against a throttling stub")
+    parser.add_argument('--sources', type=int, default=12, help="sources to fetch per run")
+    parser.add_argument('--hosts', type=int, default=2, help="stub hosts the sources are spread over")
+    parser.add_argument('--stub-rate', type=float, default=1.0, help="requests per second each stub allows")
+    parser.add_argument('--stub-burst', type=float, default=1.0, help="burst each stub allows")
+    parser.add_argument('--stub-latency', type=float, default=0.05, help="seconds each successful response takes")
+    parser.add_argument('--no-retry-after', action='store_true', help="stubs answer 429 without a Retry-After header")
+    parser.add_argument('--delay', type=float, default=fetch_data.REQUEST_DELAY,
+                        help="fixed sleep between requests in the old loop (default: REQUEST_DELAY)")
+    parser.add_argument('--initial-interval', type=float, default=fetch_data.REQUEST_DELAY,
+                        help="starting per-host interval for the adaptive limiter (default: REQUEST_DELAY)")
+    args = parser.parse_args()
+
+    stubs = [ThrottlingStub(args.stub_rate, args.stub_burst, args.stub_latency, not args.no_retry_after)
+             for _ in range(args.hosts)]
+    urls = [(f'source_{i}', f"{stubs[i % args.hosts].url}/source/{i}") for i in range(args.sources)]
+
+    try:
+        reports = [
+            benchmark('fixed_delay', partial(run_fixed_delay, delay=args.delay), urls, stubs),
+            benchmark('adaptive', partial(run_adaptive, initial_interval=args.initial_interval), urls, stubs),
+        ]
+    finally:
+        for stub in stubs:
+            stub.close()
+
+    print()
+    header = f"{'mode':12s} {'fresh':>6s} {'fallback':>9s} {'429s':>6s} {'elapsed s':>10s} {'time-to-fresh s':>16s} {'fresh/s':>8s}"
+    print(header)
+    print('-' * len(header))
+    for report in reports:
+        time_to_fresh = f"{report['time_to_fresh_s']:.2f}" if report['time_to_fresh_s'] is not None else 'never'
+        print(f"{report['mode']:12s} {report['fresh']:6d} {report['fallbacks']:9d} {report['throttled']:6d} "
+              f"{report['elapsed_s']:10.2f} {time_to_fresh:>16s} {report['fresh_per_s']:8.2f}")
+    print(f"\n(max re-queues per source: {fetch_data.MAX_REQUEUES})")
+
+if __name__ == "__main__":
+    main()
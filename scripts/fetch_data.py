@@ -5,23 +5,48 @@ Fetches data from multiple public sources and saves to backend/data/data.json
 """
 
 import os
+import codecs
 import json
 import time
 import re
+from collections import deque
 from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from functools import partial
 from pathlib import Path
+from urllib.parse import urlparse
 import requests
 from bs4 import BeautifulSoup
+from pytrends.exceptions import TooManyRequestsError
 from pytrends.request import TrendReq
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:  # Windows: fetches run without cross-process coalescing
+    fcntl = None
+
 # Load environment variables
 load_dotenv()
 
 # Configuration
 NEWSAPI_KEY = os.getenv('NEWSAPI_KEY', '')
 OUTPUT_FILE = Path(__file__).parent.parent / 'backend' / 'data' / 'data.json'
-REQUEST_DELAY = 1.5  # Seconds between requests to same domain
+REQUEST_DELAY = 1.5  # Initial seconds between requests to same domain (adapted per host)
+STATE_DIR = OUTPUT_FILE.parent / '.fetch_state'  # Per-source locks and last results
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read per chunk when streaming large pages
+STREAM_OVERLAP = 4 * 1024  # Characters carried between chunks so matches can span them
+MAX_STREAM_BYTES = 8 * 1024 * 1024  # Stop reading a streamed page after this many bytes
+
+# Adaptive per-host rate limiting
+MIN_REQUEST_INTERVAL = 0.5  # Fastest spacing a host can recover to (seconds)
+MAX_REQUEST_INTERVAL = 60  # Slowest spacing after repeated throttling (seconds)
+RATE_LIMIT_BURST = 2  # Requests a host bucket can hold before spacing applies
+SLOW_RESPONSE_SECONDS = 5  # Responses slower than this ease off the host
+THROTTLE_STATUSES = (429, 503)
+MAX_REQUEUES = 3  # Times a throttled source is re-queued before using fallback estimates
+FETCH_DEADLINE_SECONDS = 75  # Budget for all sources, well inside the backend's 120s refresh timeout
+FALLBACK_METHODS = ('fallback_estimate', 'fallback', 'public_data_estimates')
 
 # User agent for polite scraping
 HEADERS = {
@@ -43,6 +68,18 @@ data = {
     "source_status": {}
 }
 
+# Sections of `data` written by each source, as key paths
+SOURCE_SECTIONS = {
+    'newsapi': [('news',)],
+    'google_trends': [('trends',)],
+    'play_store': [('app', 'play_store')],
+    'app_store': [('app', 'app_store')],
+    'similarweb': [('traffic', 'similarweb')],
+    'youtube': [('youtube',)],
+    'investor_relations': [('company',)],
+    'competitors': [('competitors',)],
+}
+
 def log(message, status="INFO"):
     """Print formatted log message"""
     timestamp = datetime.now().strftime("%H:%M:%S")
@@ -73,6 +110,321 @@ def extract_number(text):
     except:
         return None
 
+class RateLimited(Exception):
+    """Raised when a host throttles us and the source should be re-queued"""
+    
+    def __init__(self, host, retry_after):
+        super().__init__(f"{host} is throttling requests (retry in {retry_after:.1f}s)")
+        self.host = host
+        self.retry_after = retry_after
+
+class FetchDeadlineExceeded(Exception):
+    """Raised instead of waiting on a throttled host past the fetch deadline"""
+
+class HostRateLimiter:
+    """Per-host token buckets whose refill interval adapts to 429s, Retry-After and latency
+    
+    Throttled responses double the host's interval and block it until
+    Retry-After has passed; fast successful responses shrink the interval
+    back additively, slow ones widen it.
+    """
+    
+    def __init__(self, initial_interval=REQUEST_DELAY):
+        self.initial_interval = initial_interval
+        self.hosts = {}
+        self.requeues = 0
+        # Cleared on a source's last attempt so throttling falls through to its fallback
+        self.requeue_on_throttle = True
+        # time.monotonic() after which acquire() gives up instead of waiting
+        self.deadline = None
+    
+    def _bucket(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = {
+                'interval': self.initial_interval,
+                'tokens': RATE_LIMIT_BURST,
+                'updated': time.monotonic(),
+                'blocked_until': 0.0,
+                'requests': 0,
+                'throttled': 0
+            }
+        return self.hosts[host]
+    
+    def acquire(self, host):
+        """Block until the host's bucket allows another request"""
+        bucket = self._bucket(host)
+        while True:
+            now = time.monotonic()
+            bucket['tokens'] = min(RATE_LIMIT_BURST, bucket['tokens'] + (now - bucket['updated']) / bucket['interval'])
+            bucket['updated'] = now
+            
+            wait = max(bucket['blocked_until'] - now, (1 - bucket['tokens']) * bucket['interval'])
+            if wait <= 0:
+                bucket['tokens'] -= 1
+                bucket['requests'] += 1
+                return
+            if self.deadline is not None and now + wait > self.deadline:
+                if self.requeue_on_throttle:
+                    raise RateLimited(host, wait)
+                raise FetchDeadlineExceeded(f"{host} not available again within the fetch deadline")
+            time.sleep(wait)
+    
+    def record(self, host, latency, throttled=False, retry_after=None):
+        """Adapt the host's rate to a response; returns the delay before the host may be retried"""
+        bucket = self._bucket(host)
+        
+        if throttled:
+            bucket['throttled'] += 1
+            bucket['interval'] = min(MAX_REQUEST_INTERVAL, bucket['interval'] * 2)
+            bucket['tokens'] = 0
+            # Never trust a host to park us longer than our slowest interval
+            delay = min(retry_after, MAX_REQUEST_INTERVAL) if retry_after is not None else bucket['interval']
+            bucket['blocked_until'] = max(bucket['blocked_until'], time.monotonic() + delay)
+            return delay
+        
+        if latency > SLOW_RESPONSE_SECONDS:
+            bucket['interval'] = min(MAX_REQUEST_INTERVAL, bucket['interval'] * 1.5)
+        else:
+            bucket['interval'] = max(MIN_REQUEST_INTERVAL, bucket['interval'] - 0.1)
+        return 0.0
+    
+    def throttled(self, host, latency, retry_after=None):
+        """Record a throttled response and raise RateLimited if the source may be re-queued"""
+        delay = self.record(host, latency, throttled=True, retry_after=retry_after)
+        log(f"{host} throttled request, backing off {delay:.1f}s", "WARN")
+        if self.requeue_on_throttle:
+            raise RateLimited(host, delay)
+    
+    def metrics(self):
+        """Per-host request counts, throttles and current interval"""
+        return {
+            host: {
+                'requests': bucket['requests'],
+                'throttled': bucket['throttled'],
+                'interval_seconds': round(bucket['interval'], 2)
+            }
+            for host, bucket in self.hosts.items()
+        }
+
+rate_limiter = HostRateLimiter()
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def polite_get(url, limiter=None, **kwargs):
+    """requests.get() paced by the per-host rate limiter
+    
+    Throttled responses (429/503) raise RateLimited so the caller's source is
+    re-queued; on a source's final attempt the response is returned as-is.
+    """
+    limiter = limiter or rate_limiter
+    host = urlparse(url).netloc
+    
+    limiter.acquire(host)
+    started = time.monotonic()
+    response = requests.get(url, **kwargs)
+    latency = time.monotonic() - started
+    
+    if response.status_code in THROTTLE_STATUSES:
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if limiter.requeue_on_throttle:
+            response.close()
+        limiter.throttled(host, latency, retry_after)
+    else:
+        limiter.record(host, latency)
+    return response
+
+def trends_call(fn, *args, **kwargs):
+    """Call a pytrends method paced by the rate limiter for trends.google.com"""
+    host = 'trends.google.com'
+    rate_limiter.acquire(host)
+    started = time.monotonic()
+    
+    try:
+        result = fn(*args, **kwargs)
+    except TooManyRequestsError as e:
+        response = getattr(e, 'response', None)
+        retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+        rate_limiter.throttled(host, time.monotonic() - started, retry_after)
+        raise
+    
+    rate_limiter.record(host, time.monotonic() - started)
+    return result
+
+def run_with_requeue(jobs, limiter=None, deadline=None):
+    """Run (name, callable) jobs, re-queueing any that hit RateLimited
+    
+    A throttled job goes to the back of the queue so other hosts proceed while
+    the throttled host's Retry-After elapses. After MAX_REQUEUES, or once the
+    host cannot be retried before the deadline (default FETCH_DEADLINE_SECONDS
+    from now), it runs once more with re-queueing disabled, so it completes
+    with its fallback values without waiting on the host.
+    """
+    limiter = limiter or rate_limiter
+    queue = deque((name, job, 0) for name, job in jobs)
+    limiter.deadline = deadline if deadline is not None else time.monotonic() + FETCH_DEADLINE_SECONDS
+    
+    try:
+        while queue:
+            name, job, requeues = queue.popleft()
+            try:
+                job()
+            except RateLimited as e:
+                if requeues < MAX_REQUEUES and time.monotonic() + e.retry_after < limiter.deadline:
+                    log(f"{name}: {e}; re-queued", "WARN")
+                    limiter.requeues += 1
+                    queue.append((name, job, requeues + 1))
+                    continue
+                
+                log(f"{name}: still throttled after {requeues} re-queues, using fallback", "WARN")
+                limiter.requeue_on_throttle = False
+                try:
+                    job()
+                finally:
+                    limiter.requeue_on_throttle = True
+    finally:
+        limiter.deadline = None
+
+def fallback_sources():
+    """Sources whose published sections contain fallback estimates instead of fetched data"""
+    sources = []
+    for source, key_paths in SOURCE_SECTIONS.items():
+        for key_path in key_paths:
+            section = get_section(key_path)
+            if not isinstance(section, dict):
+                continue
+            # Competitors nest one entry per competitor
+            entries = [section, *(value for value in section.values() if isinstance(value, dict))]
+            if any(entry.get('estimation_method') in FALLBACK_METHODS for entry in entries):
+                sources.append(source)
+                break
+    return sources
+
+def write_json_atomic(path, obj, **kwargs):
+    """Write JSON to a temp file and rename it over path so readers never see a partial file"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False, **kwargs)
+    os.replace(tmp_path, path)
+
+def stream_extract(url, fields, flags=re.IGNORECASE, max_bytes=MAX_STREAM_BYTES):
+    """Stream a page in chunks and return the first capture group found for each field
+    
+    fields maps a field name to its regex patterns in priority order. Only the
+    current chunk plus a short overlap is held in memory, and the download stops
+    as soon as every field has matched its preferred pattern (or after max_bytes).
+    Fields with no match are returned as None.
+    """
+    compiled = {field: [re.compile(pattern, flags) for pattern in patterns] for field, patterns in fields.items()}
+    # Per field: (index of best pattern matched so far, captured value)
+    best = {field: (len(patterns), None) for field, patterns in compiled.items()}
+    
+    with polite_get(url, headers=HEADERS, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        
+        tail = ''
+        bytes_read = 0
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        final = False
+        while not final:
+            chunk = next(chunks, None)
+            if chunk is None:
+                final = True
+                window = tail + decoder.decode(b'', final=True)
+            else:
+                bytes_read += len(chunk)
+                final = bytes_read >= max_bytes
+                window = tail + decoder.decode(chunk)
+            
+            # A match ending in the last STREAM_OVERLAP characters may still grow
+            # with the next chunk (e.g. a greedy number capture), so defer it
+            limit = len(window) if final else len(window) - STREAM_OVERLAP
+            keep_from = len(window) - STREAM_OVERLAP
+            for field, patterns in compiled.items():
+                for index, pattern in enumerate(patterns[:best[field][0]]):
+                    match = pattern.search(window)
+                    if match and match.end() <= limit:
+                        best[field] = (index, match.group(1))
+                        break
+                    if match:
+                        keep_from = min(keep_from, match.start())
+            
+            if all(index == 0 for index, _ in best.values()):
+                break
+            tail = window[max(0, keep_from):]
+    
+    return {field: value for field, (_, value) in best.items()}
+
+def get_section(key_path):
+    """Read a nested section of data by key path"""
+    node = data
+    for key in key_path:
+        node = node.get(key) if isinstance(node, dict) else None
+    return node
+
+def set_section(key_path, value):
+    """Write a nested section of data by key path"""
+    node = data
+    for key in key_path[:-1]:
+        node = node.setdefault(key, {})
+    node[key_path[-1]] = value
+
+def single_flight(source, fetch_fn):
+    """Run fetch_fn for a source, coalescing with any other process already fetching it
+    
+    The first process to take the source's lock does the upstream call and
+    publishes its sections; processes arriving while it is in flight wait for
+    the lock and reuse that result instead of hitting the upstream again.
+    """
+    if fcntl is None:
+        fetch_fn()
+        return
+    
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    result_file = STATE_DIR / f'{source}.json'
+    requested_at = time.time()
+    
+    with open(STATE_DIR / f'{source}.lock', 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            log(f"{source} fetch already in flight, waiting for its result...")
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            
+            # Reuse the result published by the in-flight fetch, if it completed
+            try:
+                if result_file.stat().st_mtime >= requested_at:
+                    with open(result_file, 'r', encoding='utf-8') as f:
+                        shared = json.load(f)
+                    for key_path in SOURCE_SECTIONS[source]:
+                        set_section(key_path, shared['sections'].get('/'.join(key_path)))
+                    data['source_status'][source] = {**shared['status'], 'coalesced': True}
+                    log(f"✓ {source}: reused result of in-flight fetch", "OK")
+                    return
+            except (OSError, ValueError, KeyError):
+                pass
+        
+        try:
+            fetch_fn()
+            write_json_atomic(result_file, {
+                'sections': {'/'.join(key_path): get_section(key_path) for key_path in SOURCE_SECTIONS[source]},
+                'status': data['source_status'].get(source, {})
+            })
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
 def fetch_newsapi():
     """Fetch news from NewsAPI"""
     log("Fetching news from NewsAPI...")
@@ -92,7 +444,7 @@ def fetch_newsapi():
             'pageSize': 20
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = polite_get(url, params=params, timeout=10)
         response.raise_for_status()
         
         articles = response.json().get('articles', [])
@@ -111,6 +463,8 @@ def fetch_newsapi():
         data['source_status']['newsapi'] = {'status': 'ok', 'count': len(data['news'])}
         log(f"✓ Fetched {len(data['news'])} news articles", "OK")
         
+    except RateLimited:
+        raise
     except Exception as e:
         log(f"NewsAPI fetch failed: {str(e)}", "ERROR")
         data['source_status']['newsapi'] = {'status': 'error', 'error': str(e)}
@@ -120,16 +474,16 @@ def fetch_google_trends():
     log("Fetching Google Trends data...")
     
     try:
-        pytrends = TrendReq(hl='en-US', tz=360, timeout=(10, 25))
+        pytrends = trends_call(TrendReq, hl='en-US', tz=360, timeout=(10, 25))
         
         # Keywords to track - Algeria focused
         keywords = ['Jumia Algeria', 'Ouedkniss', 'Batolis', 'ouedkniss', 'Soukshop']
         
         # Build payload for 12-month timeframe with Algeria geo-targeting
-        pytrends.build_payload(keywords, timeframe='today 12-m', geo='DZ')  # DZ = Algeria
+        trends_call(pytrends.build_payload, keywords, timeframe='today 12-m', geo='DZ')  # DZ = Algeria
         
         # Get interest over time
-        interest_df = pytrends.interest_over_time()
+        interest_df = trends_call(pytrends.interest_over_time)
         
         if not interest_df.empty:
             # Convert to timeseries
@@ -147,11 +501,9 @@ def fetch_google_trends():
             data['trends']['timeseries'] = timeseries
             log(f"✓ Fetched {len(timeseries)} trend data points for Algeria", "OK")
         
-        time.sleep(REQUEST_DELAY)
-        
         # Get interest by region for Jumia Algeria across Algerian cities/regions
-        pytrends.build_payload(['Jumia'], timeframe='today 12-m', geo='DZ')
-        region_df = pytrends.interest_by_region(resolution='CITY', inc_low_vol=True, inc_geo_code=False)
+        trends_call(pytrends.build_payload, ['Jumia'], timeframe='today 12-m', geo='DZ')
+        region_df = trends_call(pytrends.interest_by_region, resolution='CITY', inc_low_vol=True, inc_geo_code=False)
         
         if not region_df.empty:
             by_country = []
@@ -167,6 +519,8 @@ def fetch_google_trends():
         
         data['source_status']['google_trends'] = {'status': 'ok'}
         
+    except RateLimited:
+        raise
     except Exception as e:
         log(f"Google Trends fetch failed: {str(e)}", "ERROR")
         data['source_status']['google_trends'] = {'status': 'error', 'error': str(e)}
@@ -177,7 +531,7 @@ def fetch_play_store():
     
     try:
         url = "https://play.google.com/store/apps/details?id=com.jumia.android&hl=en"
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = polite_get(url, headers=HEADERS, timeout=10)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -214,6 +568,8 @@ def fetch_play_store():
         data['source_status']['play_store'] = {'status': 'ok' if rating else 'partial'}
         log(f"✓ Play Store data: Rating={data['app']['play_store']['rating']}, Reviews={data['app']['play_store']['reviews']}", "OK")
         
+    except RateLimited:
+        raise
     except Exception as e:
         log(f"Play Store fetch failed: {str(e)}", "ERROR")
         data['app']['play_store'] = {
@@ -224,8 +580,6 @@ def fetch_play_store():
             'error': str(e)
         }
         data['source_status']['play_store'] = {'status': 'error', 'error': str(e)}
-    
-    time.sleep(REQUEST_DELAY)
 
 def fetch_app_store():
     """Fetch Apple App Store data"""
@@ -234,7 +588,7 @@ def fetch_app_store():
     try:
         # Jumia app ID
         url = "https://apps.apple.com/us/app/jumia-online-shopping/id625477841"
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = polite_get(url, headers=HEADERS, timeout=10)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -267,6 +621,8 @@ def fetch_app_store():
         data['source_status']['app_store'] = {'status': 'ok' if rating else 'partial'}
         log(f"✓ App Store data: Rating={data['app']['app_store']['rating']}", "OK")
         
+    except RateLimited:
+        raise
     except Exception as e:
         log(f"App Store fetch failed: {str(e)}", "ERROR")
         data['app']['app_store'] = {
@@ -276,8 +632,6 @@ def fetch_app_store():
             'error': str(e)
         }
         data['source_status']['app_store'] = {'status': 'error', 'error': str(e)}
-    
-    time.sleep(REQUEST_DELAY)
 
 def fetch_similarweb():
     """Fetch SimilarWeb traffic data"""
@@ -285,26 +639,14 @@ def fetch_similarweb():
     
     try:
         url = "https://www.similarweb.com/website/jumia.com/"
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        
-        # Try to extract global rank
-        global_rank = None
-        rank_patterns = [r'Global Rank[:\s]+#?([\d,]+)', r'#([\d,]+)\s*Global']
-        for pattern in rank_patterns:
-            match = re.search(pattern, response.text, re.IGNORECASE)
-            if match:
-                global_rank = extract_number(match.group(1))
-                break
         
-        # Try to extract monthly visits
-        monthly_visits = None
-        visits_patterns = [r'([\d.KMB]+)\s*Total Visits', r'Monthly Visits[:\s]+([\d.KMB]+)']
-        for pattern in visits_patterns:
-            match = re.search(pattern, response.text, re.IGNORECASE)
-            if match:
-                monthly_visits = extract_number(match.group(1))
-                break
+        # Stream the page and stop once global rank and monthly visits are found
+        found = stream_extract(url, {
+            'global_rank': [r'Global Rank[:\s]+#?([\d,]+)', r'#([\d,]+)\s*Global'],
+            'monthly_visits': [r'([\d.KMB]+)\s*Total Visits', r'Monthly Visits[:\s]+([\d.KMB]+)']
+        })
+        global_rank = extract_number(found['global_rank'])
+        monthly_visits = extract_number(found['monthly_visits'])
         
         data['traffic']['similarweb'] = {
             'global_rank': global_rank if global_rank else 5000,
@@ -316,6 +658,8 @@ def fetch_similarweb():
         data['source_status']['similarweb'] = {'status': 'ok' if global_rank else 'partial'}
         log(f"✓ SimilarWeb: Rank={data['traffic']['similarweb']['global_rank']}", "OK")
         
+    except RateLimited:
+        raise
     except Exception as e:
         log(f"SimilarWeb fetch failed: {str(e)}", "ERROR")
         data['traffic']['similarweb'] = {
@@ -325,8 +669,6 @@ def fetch_similarweb():
             'error': str(e)
         }
         data['source_status']['similarweb'] = {'status': 'error', 'error': str(e)}
-    
-    time.sleep(REQUEST_DELAY)
 
 def fetch_youtube():
     """Fetch YouTube channel data"""
@@ -335,18 +677,13 @@ def fetch_youtube():
     try:
         # Jumia official YouTube channel
         url = "https://www.youtube.com/@JumiaGroup"
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
         
-        # Try to extract subscriber count
-        subscribers = None
-        sub_patterns = [r'"subscriberCountText".*?"simpleText":"([\d.KMB]+)\s*subscribers?"', 
-                       r'([\d.KMB]+)\s*subscribers?']
-        for pattern in sub_patterns:
-            match = re.search(pattern, response.text, re.IGNORECASE)
-            if match:
-                subscribers = extract_number(match.group(1))
-                break
+        # Channel pages are several MB; stream and stop at the subscriber count
+        found = stream_extract(url, {
+            'subscribers': [r'"subscriberCountText".*?"simpleText":"([\d.KMB]+)\s*subscribers?"',
+                            r'([\d.KMB]+)\s*subscribers?']
+        })
+        subscribers = extract_number(found['subscribers'])
         
         data['youtube'] = {
             'subscribers': subscribers if subscribers else 50000,
@@ -357,6 +694,8 @@ def fetch_youtube():
         data['source_status']['youtube'] = {'status': 'ok' if subscribers else 'partial'}
         log(f"✓ YouTube: {data['youtube']['subscribers']} subscribers", "OK")
         
+    except RateLimited:
+        raise
     except Exception as e:
         log(f"YouTube fetch failed: {str(e)}", "ERROR")
         data['youtube'] = {
@@ -365,8 +704,6 @@ def fetch_youtube():
             'error': str(e)
         }
         data['source_status']['youtube'] = {'status': 'error', 'error': str(e)}
-    
-    time.sleep(REQUEST_DELAY)
 
 def fetch_investor_data():
     """Fetch company data from investor relations and SEC filings"""
@@ -375,34 +712,19 @@ def fetch_investor_data():
     try:
         # Jumia investor relations page
         url = "https://investor.jumia.com/press-releases"
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Look for financial metrics in press releases, streaming the page
+        # (case-insensitive matching, so no lowercased copy of the page is needed)
+        found = stream_extract(url, {
+            # Revenue, e.g. "$123M revenue" or "revenue of $123 million"
+            'revenue': [r'revenue.*?\$([\d.]+)\s*million', r'\$([\d.]+)m\s*revenue', r'\$([\d.]+)\s*million.*?revenue'],
+            'gmv': [r'gmv.*?\$([\d.]+)\s*billion', r'\$([\d.]+)b\s*gmv']
+        })
         
         # Try to extract latest financial data
-        revenue = None
-        gmv = None
-        active_users = None
-        
-        # Look for financial metrics in press releases
-        text_content = response.text.lower()
-        
-        # Extract revenue (looking for patterns like "$123M revenue" or "revenue of $123 million")
-        revenue_patterns = [r'revenue.*?\$([\d.]+)\s*million', r'\$([\d.]+)m\s*revenue', r'\$([\d.]+)\s*million.*?revenue']
-        for pattern in revenue_patterns:
-            match = re.search(pattern, text_content, re.IGNORECASE)
-            if match:
-                revenue = float(match.group(1)) * 1_000_000
-                break
-        
-        # Extract GMV
-        gmv_patterns = [r'gmv.*?\$([\d.]+)\s*billion', r'\$([\d.]+)b\s*gmv']
-        for pattern in gmv_patterns:
-            match = re.search(pattern, text_content, re.IGNORECASE)
-            if match:
-                gmv = float(match.group(1)) * 1_000_000_000
-                break
+        revenue = float(found['revenue']) * 1_000_000 if found['revenue'] else None
+        gmv = float(found['gmv']) * 1_000_000_000 if found['gmv'] else None
+        fallback_fields = [field for field, value in (('revenue', revenue), ('gmv', gmv)) if not value]
         
         # Get Algeria-specific data
         algeria_url = "https://www.jumia.dz/"
@@ -422,7 +744,8 @@ def fetch_investor_data():
             'active_users': 3500000,
             'funding_total': 823000000,  # Public data
             'description': 'Leading pan-African e-commerce platform',
-            'estimation_method': 'public_filings_and_press_releases',
+            'estimation_method': 'fallback_estimate' if fallback_fields else 'public_filings_and_press_releases',
+            'fallback_fields': fallback_fields,
             'confidence': 'medium',
             'sources': {
                 'investor_relations': url,
@@ -430,9 +753,11 @@ def fetch_investor_data():
             }
         }
         
-        data['source_status']['investor_relations'] = {'status': 'ok'}
+        data['source_status']['investor_relations'] = {'status': 'partial' if fallback_fields else 'ok'}
         log(f"✓ Company data: {data['company']['name']}", "OK")
         
+    except RateLimited:
+        raise
     except Exception as e:
         log(f"Investor data fetch failed: {str(e)}", "ERROR")
         # Keep the fallback data
@@ -470,7 +795,8 @@ def fetch_competitor_data(name, play_store_id=None, website=None):
         'app_rating': None,
         'website': website,
         'website_rank': None,
-        'estimation_method': 'fallback',
+        # Competitors without a store listing only ever get market research estimates
+        'estimation_method': 'fallback' if play_store_id else 'market_research_estimate',
         'region': 'Algeria'
     }
     
@@ -478,7 +804,7 @@ def fetch_competitor_data(name, play_store_id=None, website=None):
     if play_store_id:
         try:
             url = f"https://play.google.com/store/apps/details?id={play_store_id}&hl=en&gl=DZ"
-            response = requests.get(url, headers=HEADERS, timeout=10)
+            response = polite_get(url, headers=HEADERS, timeout=10)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -487,7 +813,8 @@ def fetch_competitor_data(name, play_store_id=None, website=None):
                 competitor['app_rating'] = extract_number(rating_elem.text)
                 competitor['estimation_method'] = 'scraped'
             
-            time.sleep(REQUEST_DELAY)
+        except RateLimited:
+            raise
         except:
             pass
     
@@ -516,22 +843,8 @@ def fetch_competitor_data(name, play_store_id=None, website=None):
     log(f"✓ {name}: Rating={competitor['app_rating']}, Visitors~{competitor['estimated_monthly_visitors']:,}", "OK")
     return competitor
 
-def main():
-    """Main execution function"""
-    log("=" * 60)
-    log("JUMIA Analytics Data Fetcher")
-    log("=" * 60)
-    
-    # Fetch all data sources
-    fetch_newsapi()
-    fetch_google_trends()
-    fetch_play_store()
-    fetch_app_store()
-    fetch_similarweb()
-    fetch_youtube()
-    fetch_investor_data()
-    
-    # Fetch competitor data - Algeria specific
+def fetch_competitors():
+    """Fetch competitor data - Algeria specific"""
     log("\n" + "=" * 60)
     log("Fetching Algeria Competitor Data")
     log("=" * 60)
@@ -545,6 +858,45 @@ def main():
     
     data['competitors'] = competitors
     data['source_status']['competitors'] = {'status': 'ok', 'count': len(competitors), 'region': 'Algeria'}
+
+def main():
+    """Main execution function"""
+    log("=" * 60)
+    log("JUMIA Analytics Data Fetcher")
+    log("=" * 60)
+    
+    # Fetch all data sources, coalescing with any concurrent fetcher and
+    # re-queueing sources whose host is throttling us
+    sources = [
+        ('newsapi', fetch_newsapi),
+        ('google_trends', fetch_google_trends),
+        ('play_store', fetch_play_store),
+        ('app_store', fetch_app_store),
+        ('similarweb', fetch_similarweb),
+        ('youtube', fetch_youtube),
+        ('investor_relations', fetch_investor_data),
+        ('competitors', fetch_competitors),
+    ]
+    run_with_requeue([(source, partial(single_flight, source, fetch_fn)) for source, fetch_fn in sources])
+    
+    # Report fallback estimates separately from fetch success
+    fallbacks = fallback_sources()
+    for source in fallbacks:
+        if isinstance(data['source_status'].get(source), dict):
+            data['source_status'][source]['fallback'] = True
+    # Sources that failed or only partly succeeded, whether or not they have a fallback section
+    error_sources = [source for source, status in data['source_status'].items()
+                     if isinstance(status, dict) and status.get('status') == 'error']
+    partial_sources = [source for source, status in data['source_status'].items()
+                       if isinstance(status, dict) and status.get('status') == 'partial']
+    data['fetch_metrics'] = {
+        'fallback_sources': fallbacks,
+        'fallback_count': len(fallbacks),
+        'error_sources': error_sources,
+        'partial_sources': partial_sources,
+        'requeues': rate_limiter.requeues,
+        'hosts': rate_limiter.metrics()
+    }
     
     # Add timestamp
     data['fetched_at'] = datetime.now().isoformat()
@@ -552,9 +904,8 @@ def main():
     # Ensure output directory exists
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
     
-    # Save to JSON
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Save to JSON (atomically, so the API keeps serving the previous file until now)
+    write_json_atomic(OUTPUT_FILE, data, indent=2)
     
     log("\n" + "=" * 60)
     log("SUMMARY")
@@ -567,6 +918,11 @@ def main():
     
     log(f"Data saved to: {OUTPUT_FILE}")
     log(f"Sources successful: {successful}/{total}")
+    log(f"Fallback estimates used: {len(fallbacks)}/{len(SOURCE_SECTIONS)}"
+        + (f" ({', '.join(fallbacks)})" if fallbacks else ""))
+    log(f"Errors: {len(error_sources)}" + (f" ({', '.join(error_sources)})" if error_sources else "")
+        + f", partial: {len(partial_sources)}" + (f" ({', '.join(partial_sources)})" if partial_sources else ""))
+    log(f"Throttled responses: {sum(host['throttled'] for host in rate_limiter.metrics().values())}, re-queues: {rate_limiter.requeues}")
     
     # Show status of each source
     for source, status in data['source_status'].items():
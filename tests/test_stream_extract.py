@@ -0,0 +1,143 @@
+"""
+Regression tests for the bounded-memory streaming fetch in scripts/fetch_data.py
+Runs offline against a local http.server stub. Python heap is checked with
+tracemalloc; process peak RSS is checked with getrusage in a child interpreter.
+"""
+
+import socket
+import subprocess
+import sys
+import textwrap
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import fetch_data
+from fetch_data import STREAM_CHUNK_SIZE, stream_extract
+
+PAGE_SIZE = 128 * 1024 * 1024  # Far larger than MAX_STREAM_BYTES
+MEMORY_CAP = 2 * 1024 * 1024  # Peak traced allocation allowed per extraction
+RSS_CAP = 16 * 1024 * 1024  # Peak RSS growth allowed per extraction
+# A few chunks plus the stub's small socket buffers; well below MAX_STREAM_BYTES
+EARLY_STOP_BYTES = fetch_data.MAX_STREAM_BYTES // 4
+FILLER = b'x' * 1023 + b'\n'
+RANK_PATTERNS = {'global_rank': [r'Global Rank[:\s]+#?([\d,]+)', r'#([\d,]+)\s*Global']}
+
+class PageStub:
+    """Serves a page of PAGE_SIZE bytes: a prefix, then filler; counts bytes actually sent"""
+
+    def __init__(self, prefix):
+        self.sent = 0
+        self.done = threading.Event()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def setup(self):
+                super().setup()
+                # Keep kernel buffering small so bytes sent track bytes actually read
+                self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 64 * 1024)
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(PAGE_SIZE))
+                self.end_headers()
+                try:
+                    self.wfile.write(prefix)
+                    stub.sent += len(prefix)
+                    block = FILLER * 64
+                    while stub.sent < PAGE_SIZE:
+                        piece = block[:PAGE_SIZE - stub.sent]
+                        self.wfile.write(piece)
+                        stub.sent += len(piece)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    stub.done.set()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def page_stub():
+    stubs = []
+
+    def make(prefix):
+        stub = PageStub(prefix)
+        stubs.append(stub)
+        return stub
+
+    yield make
+    for stub in stubs:
+        stub.close()
+
+def extract_with_peak(url, fields):
+    """Run stream_extract and return (result, peak traced bytes)"""
+    tracemalloc.start()
+    try:
+        result = stream_extract(url, fields)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_stops_reading_after_match(page_stub):
+    stub = page_stub(b'<html>Global Rank: #1,234 ' + FILLER)
+    result, peak = extract_with_peak(stub.url, RANK_PATTERNS)
+    stub.done.wait(timeout=30)
+
+    assert result == {'global_rank': '1,234'}
+    assert peak < MEMORY_CAP
+    # Reading on to the MAX_STREAM_BYTES cap would send several times this
+    assert stub.sent < EARLY_STOP_BYTES
+
+def test_memory_and_download_capped_without_match(page_stub):
+    stub = page_stub(b'<html>')
+    result, peak = extract_with_peak(stub.url, RANK_PATTERNS)
+    stub.done.wait(timeout=30)
+
+    assert result == {'global_rank': None}
+    assert peak < MEMORY_CAP
+    assert stub.sent < fetch_data.MAX_STREAM_BYTES + EARLY_STOP_BYTES
+
+def test_match_spanning_chunk_boundary_is_not_truncated(page_stub):
+    label = b'Global Rank: #'
+    number = b'1,234,567'
+    # Put the chunk boundary right after "1,234,"
+    padding = b'x' * (STREAM_CHUNK_SIZE - len(label) - len(b'1,234,') - 1) + b' '
+    stub = page_stub(padding + label + number + b' ' + FILLER)
+
+    result, _ = extract_with_peak(stub.url, RANK_PATTERNS)
+
+    assert result == {'global_rank': '1,234,567'}
+
+def test_peak_rss_capped_without_match(page_stub):
+    stub = page_stub(b'<html>')
+    scripts_dir = Path(__file__).parent.parent / 'scripts'
+    child = textwrap.dedent(f"""
+        import resource, sys
+        sys.path.insert(0, {str(scripts_dir)!r})
+        from fetch_data import stream_extract
+        fields = {{'global_rank': [r'Global Rank[:\\s]+#?([\\d,]+)']}}
+        stream_extract({stub.url!r}, fields, max_bytes=64 * 1024)  # Warm up imports and the connection pool
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        assert stream_extract({stub.url!r}, fields) == {{'global_rank': None}}
+        print((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * 1024)
+    """)
+    result = subprocess.run([sys.executable, '-c', child], capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    # ru_maxrss is in KB on Linux
+    assert int(result.stdout.strip()) < RSS_CAP